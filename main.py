@@ -1,37 +1,69 @@
 import tkinter as tk
-from tkinter import ttk
 import sys
-from pomodoro_timer import PomodoroTimer
-from notion_integration import add_notion_integration
 
-if __name__ == "__main__":
-    root = tk.Tk()
+# Keep a reference to the window icon so the PhotoImage isn't garbage collected
+_ICON = None
+
+def _set_icon(root):
+    """Load the app icon once and apply it to all windows"""
+    global _ICON
     
-    # Set app icon if available
     try:
-        if sys.platform == 'win32':
-            root.iconbitmap("tomato.ico")
-    except:
+        _ICON = tk.PhotoImage(file="tomato.png")
+        root.iconphoto(True, _ICON)
+    except tk.TclError:
+        # Icon file missing or unreadable
         pass
         
-    # Set window title with emoji for supported platforms
-    root.title("🍅 Pomodoro Timer with Notion Sync")
+    # Keep the native .ico on Windows for the taskbar
+    if sys.platform == 'win32':
+        try:
+            root.iconbitmap("tomato.ico")
+        except tk.TclError:
+            pass
+
+def _finish_init(root):
+    """Import the heavy modules and build the app once the window is visible"""
+    import asyncio
+    import threading
+    from pomodoro_timer import PomodoroTimer
+    from notion_integration import add_notion_integration, NotionRateLimiter
+    
+    # PomodoroTimer.set_theme picks a built-in ttk theme, so ttkthemes isn't
+    # loaded; anything it applied here would be replaced straight away
+    
+    # Run an asyncio loop on a background thread for Notion calls;
+    # Tk itself must stay on the main thread
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever, daemon=True)
+    loop_thread.start()
     
-    # Apply a themed style if available
-    try:
-        from ttkthemes import ThemedTk, ThemedStyle
-        if isinstance(root, tk.Tk):
-            style = ThemedStyle(root)
-            style.set_theme("arc")  # You can choose: 'arc', 'plastik', 'clearlooks', etc.
-    except ImportError:
-        # ttkthemes not available, use default styling
-        pass
-        
     # Create the main app
     app = PomodoroTimer(root)
     
     # Add Notion integration
-    notion_integration = add_notion_integration(app)
+    notion_integration = add_notion_integration(
+        app, loop=loop, rate_limiter=NotionRateLimiter(rate=2.5, burst=3))
+    
+    def on_close():
+        notion_integration.shutdown()
+        loop.call_soon_threadsafe(loop.stop)
+        root.destroy()
+        
+    root.protocol("WM_DELETE_WINDOW", on_close)
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    
+    # Set app icon if available
+    _set_icon(root)
+        
+    # Set window title with emoji for supported platforms
+    root.title("🍅 Pomodoro Timer with Notion Sync")
+    
+    # Paint the window before pulling in requests and PIL
+    root.update_idletasks()
+    root.after(0, _finish_init, root)
     
     # Start the application
     root.mainloop()
@@ -1,107 +1,450 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+import array
+import asyncio
+import hashlib
 import json
 import os
+import queue
+import random
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+try:
+    import orjson
+except ImportError:
+    # orjson not available, use the standard json module
+    orjson = None
+
+# Set NOTION_POMODORO_DEBUG=1 to raise on malformed Notion data instead of skipping it
+DEBUG = os.environ.get("NOTION_POMODORO_DEBUG") == "1"
+
+# Notion API version sent with every request; a stable release
+NOTION_VERSION = "2022-06-28"
+
+# Maximum number of queued session logs sent per flush batch
+NOTION_BATCH_SIZE = 100
+
+# How often queued session logs are retried, in milliseconds
+FLUSH_INTERVAL_MS = 30000
+MAX_LOG_ATTEMPTS = 3  # Queued sends per session before it is left for manual logging
+SAVE_DELAY_MS = 2000  # Coalesce data file writes after auto-logged sessions
+
+# How long cached database lists and connection checks stay valid, in seconds
+DATABASE_CACHE_TTL = 60
+CONNECTION_CACHE_TTL = 30
+
+# Largest page size Notion allows for paginated endpoints
+NOTION_PAGE_SIZE = 100
+
+# Maximum number of Notion requests in flight at once
+MAX_CONCURRENT_REQUESTS = 3
+
+# Worker threads for blocking Notion calls
+MAX_WORKERS = 4
+
+# Server errors retried by NotionClient._request, only for requests that are
+# safe to repeat; a page creation may already have been stored
+RETRY_STATUS_CODES = [500, 502, 503, 504]
+
+# Retries in NotionClient._request honor Retry-After plus random jitter so
+# concurrent workers don't retry in lockstep. 429s are always retried since
+# Notion rejected the request without processing it.
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_BACKOFF = 0.5  # Seconds, doubled per attempt when Retry-After is missing
+
+# Pooled connections to api.notion.com; one per worker thread so
+# connections aren't discarded while bulk jobs run
+HTTP_POOL_SIZE = MAX_WORKERS
+
+# Rich text property holding each session log's idempotency key; log
+# databases without it are logged to without duplicate checks
+IDEMPOTENCY_PROPERTY = "idem"
+
+# Date offsets for the session log ranges
+_ONE_DAY = timedelta(days=1)
+_SIX_DAYS = timedelta(days=6)
+
+def title_property(content):
+    """Build a Notion title property value"""
+    return {"title": [{"text": {"content": content}}]}
+
+def rich_text_property(content):
+    """Build a Notion rich_text property value"""
+    return {"rich_text": [{"text": {"content": content}}]}
+
+def first_plain_text(properties, candidates):
+    """Return the plain text of the first non-empty title/rich_text property
+    
+    candidates are property names tried in order; returns None if none of
+    them has any text.
+    """
+    for key in candidates:
+        prop = properties.get(key)
+        if not prop:
+            continue
+        text = prop.get("title") or prop.get("rich_text")
+        if text:
+            return text[0].get("plain_text", "")
+    return None
+
+def session_log_key(start_time, project, task):
+    """Return a deterministic idempotency key for a logged session"""
+    data = f"{start_time}|{project}|{task}".encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def dumps_json(obj):
+    """Serialize obj to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+def loads_json(data):
+    """Parse JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class NotionRateLimiter:
+    """Thread-safe token bucket that keeps requests under Notion's rate limit"""
+    
+    def __init__(self, rate=2.5, burst=3):
+        self.rate = float(rate)  # Tokens added per second
+        self.burst = burst  # Maximum tokens held at once
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        
+    def acquire(self):
+        """Block until a request token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                    
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class TkDispatcher:
+    """Deliver callbacks from worker threads to the Tk thread
+    
+    Worker threads write a byte to a pipe that Tk watches with
+    createfilehandler, so Tk wakes up as soon as a result is ready without
+    polling. Windows has no Tk file handlers, so there the queue is polled.
+    """
+    
+    POLL_INTERVAL_MS = 50
+    
+    def __init__(self, root, logger=None):
+        self.root = root
+        self.logger = logger
+        self.queue = queue.Queue()
+        self.read_fd = None
+        self.write_fd = None
+        
+        if sys.platform != 'win32' and hasattr(root.tk, "createfilehandler"):
+            self.read_fd, self.write_fd = os.pipe()
+            os.set_blocking(self.read_fd, False)
+            os.set_blocking(self.write_fd, False)
+            root.tk.createfilehandler(self.read_fd, tk.READABLE, self._on_readable)
+        else:
+            self.root.after(self.POLL_INTERVAL_MS, self._poll)
+            
+    def call_soon(self, callback, *args):
+        """Schedule a callback on the Tk thread; safe to call from any thread"""
+        self.queue.put((callback, args))
+        
+        if self.write_fd is not None:
+            try:
+                os.write(self.write_fd, b"\0")
+            except OSError:
+                # Pipe full or closed; queued callbacks still get drained
+                pass
+                
+    def _on_readable(self, fd, mask):
+        """Tk file handler: clear the wakeup bytes and run queued callbacks"""
+        try:
+            os.read(fd, 4096)
+        except OSError:
+            pass
+        self._drain()
+        
+    def _poll(self):
+        """Fallback for platforms without Tk file handlers"""
+        try:
+            self._drain()
+        finally:
+            self.root.after(self.POLL_INTERVAL_MS, self._poll)
+        
+    def _drain(self):
+        """Run every callback waiting in the queue"""
+        while True:
+            try:
+                callback, args = self.queue.get_nowait()
+            except queue.Empty:
+                return
+                
+            try:
+                callback(*args)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Error in Notion callback: {str(e)}")
+                if DEBUG:
+                    # Show the traceback through Tk's error hook; raising here
+                    # would propagate out of mainloop and end the app
+                    self.root.report_callback_exception(*sys.exc_info())
+                    
+    def close(self):
+        """Stop watching the wakeup pipe"""
+        if self.read_fd is None:
+            return
+            
+        self.root.tk.deletefilehandler(self.read_fd)
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+        self.read_fd = self.write_fd = None
 
 class NotionClient:
     """Class to handle Notion API interactions"""
     
-    def __init__(self, token=None):
+    def __init__(self, token=None, rate_limiter=None, session=None):
         self.token = token
-        self.headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28"  # Using a stable API version
-        } if token else None
         self.base_url = "https://api.notion.com/v1"
         self.logger = None  # Will be set by NotionIntegration
+        self.rate_limiter = rate_limiter or NotionRateLimiter()
+        self.session = session or self._create_session()  # Keep-alive connection pool
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION
+        })
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        self._inflight = {}  # Identical read requests currently being sent
+        self._inflight_lock = threading.Lock()
+        self._db_cache = None  # (timestamp, databases)
+        self._connection_cache = None  # (timestamp, is_connected)
+        self._no_idempotency = set()  # Log databases without an idem property
         
     def set_token(self, token):
         """Set or update the API token"""
         self.token = token
-        self.headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28"
-        }
+        self._db_cache = None
+        self._connection_cache = None
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        
+    @staticmethod
+    def _create_session():
+        """Create a session with a small pool for the single Notion host
+        
+        The adapter only retries failed connections (and reads for GET);
+        status retries happen in _request, which knows which calls are safe
+        to repeat.
+        """
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False  # Hand the final response back to the caller
+        )
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry))
+        return session
+        
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+        
+    def _request(self, method, path, retry=True, **kwargs):
+        """Send a rate-limited request, backing off and retrying on 429 responses
+        
+        5xx responses are retried too unless retry is False, which callers
+        creating pages pass so a request Notion already stored isn't repeated.
+        """
+        if "json" in kwargs:
+            # Encode the body ourselves so orjson is used when available;
+            # the session already sends Content-Type: application/json
+            kwargs["data"] = dumps_json(kwargs.pop("json"))
+            
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self.rate_limiter.acquire()
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            status = response.status_code
+            if attempt == RATE_LIMIT_RETRIES:
+                break
+            if status != 429 and not (retry and status in RETRY_STATUS_CODES):
+                break
+                
+            delay = self._retry_delay(response, attempt)
+            if self.logger:
+                self.logger.info(f"Notion returned {status}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        
+        # Any authenticated response tells us whether the token works, so
+        # connection checks can skip their own probe
+        if response.status_code == 200:
+            self._connection_cache = (time.monotonic(), True)
+        elif response.status_code == 401:
+            self._connection_cache = (time.monotonic(), False)
+            
+        if response.status_code == 429 and self.logger:
+            retry_after = response.headers.get("Retry-After")
+            self.logger.warning(f"Still rate limited by Notion after retries (Retry-After: {retry_after})")
+        return response
+        
+    @staticmethod
+    def _retry_delay(response, attempt):
+        """Seconds to wait before retrying a 429 or 5xx response"""
+        try:
+            delay = float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            delay = RATE_LIMIT_BACKOFF * (2 ** attempt)
+        return delay + random.random()
+        
+    def _coalesced_request(self, method, path, **kwargs):
+        """Send a read-only request, sharing the response with identical in-flight calls"""
+        key = (method, path, json.dumps(kwargs.get("json"), sort_keys=True))
+        
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+                
+        if not is_owner:
+            # Another caller is already sending this request
+            return future.result()
+            
+        try:
+            response = self._request(method, path, **kwargs)
+            future.set_result(response)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+                
+    def _cached(self, cache, ttl):
+        """Return the cached value if it is still fresh, otherwise None"""
+        if cache and time.monotonic() - cache[0] < ttl:
+            return cache[1]
+        return None
         
-    def test_connection(self):
-        """Test if the connection to Notion API works"""
+    def cached_connection_status(self):
+        """Return the last connection check if it is still fresh, otherwise None"""
+        return self._cached(self._connection_cache, CONNECTION_CACHE_TTL)
+        
+    def test_connection(self, force=False):
+        """Test if the connection to Notion API works
+        
+        The result is cached for a short time unless force is set.
+        """
         if not self.token:
             return False
             
+        cached = None if force else self._cached(self._connection_cache, CONNECTION_CACHE_TTL)
+        if cached is not None:
+            return cached
+            
         try:
-            response = requests.get(f"{self.base_url}/users/me", headers=self.headers)
-            return response.status_code == 200
+            response = self._coalesced_request("GET", "/users/me")
+            is_connected = response.status_code == 200
         except Exception:
             return False
             
-    def get_databases(self):
-        """Get list of databases the integration has access to"""
+        self._connection_cache = (time.monotonic(), is_connected)
+        return is_connected
+            
+    def _iter_results(self, path, body=None):
+        """Yield every result from a paginated Notion endpoint
+        
+        Pages are requested with start_cursor until has_more is false. Raises
+        requests.HTTPError if any page request fails.
+        """
+        body = dict(body or {}, page_size=NOTION_PAGE_SIZE)
+        
+        while True:
+            response = self._coalesced_request("POST", path, json=body)
+            response.raise_for_status()
+            
+            data = response.json()
+            yield from data.get("results", [])
+            
+            cursor = data.get("next_cursor")
+            if not data.get("has_more") or not cursor:
+                return
+            body = dict(body, start_cursor=cursor)
+            
+    def get_databases(self, force=False):
+        """Get list of databases the integration has access to
+        
+        The list is cached for a minute unless force is set.
+        """
         if not self.token:
             return []
             
-        try:
-            # First try with the filter approach
-            response = requests.post(
-                f"{self.base_url}/search",
-                headers=self.headers,
-                json={"filter": {"value": "database", "property": "object"}}
-            )
+        cached = None if force else self._cached(self._db_cache, DATABASE_CACHE_TTL)
+        if cached is not None:
+            return list(cached)
             
-            if response.status_code == 200:
-                results = response.json().get("results", [])
-                if self.logger:
-                    self.logger.info(f"Found {len(results)} databases with filter method")
-                return results
-            else:
-                # Log the error
-                if self.logger:
-                    self.logger.error(f"Database search failed: {response.status_code} - {response.text}")
-                
-                # Try alternative approach without filter
-                response = requests.post(
-                    f"{self.base_url}/search",
-                    headers=self.headers,
-                    json={}  # No filter, search all objects
-                )
-                
-                if response.status_code == 200:
-                    # Filter for databases manually
-                    all_results = response.json().get("results", [])
-                    database_results = [r for r in all_results if r.get("object") == "database"]
-                    if self.logger:
-                        self.logger.info(f"Found {len(database_results)} databases with alternative method")
-                    return database_results
-                else:
-                    if self.logger:
-                        self.logger.error(f"Alternative search failed: {response.status_code} - {response.text}")
-                    return []
+        databases = self._search_databases()
+        if databases:
+            self._db_cache = (time.monotonic(), databases)
+        return list(databases)
+        
+    def _search_databases(self):
+        """Search Notion for databases shared with the integration"""
+        try:
+            results = list(self._iter_results(
+                "/search",
+                {"filter": {"value": "database", "property": "object"}}
+            ))
+            if self.logger:
+                self.logger.info(f"Found {len(results)} databases")
+            return results
+        except requests.HTTPError as e:
+            if self.logger:
+                self.logger.error(f"Database search failed: {e.response.status_code} - {e.response.text}")
+            return []
         except Exception as e:
             if self.logger:
                 self.logger.error(f"Exception getting databases: {str(e)}")
             return []
             
-    def get_database_tasks(self, database_id):
-        """Get tasks from a specific database"""
+    def get_database_tasks(self, database_id, since=None):
+        """Get all tasks from a specific database
+        
+        If since is an ISO timestamp, only tasks edited on or after it are
+        returned. Raises requests.RequestException if the query fails, so an
+        error isn't mistaken for "no tasks changed".
+        """
         if not self.token or not database_id:
             return []
             
-        try:
-            response = requests.post(
-                f"{self.base_url}/databases/{database_id}/query",
-                headers=self.headers,
-                json={}
-            )
+        body = None
+        if since:
+            body = {
+                "filter": {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": since}
+                }
+            }
             
-            if response.status_code == 200:
-                return response.json().get("results", [])
-            else:
-                return []
-        except Exception:
-            return []
+        return list(self._iter_results(f"/databases/{database_id}/query", body))
             
     def create_task(self, database_id, task_name, project_name=None):
         """Create a new task in a Notion database"""
@@ -109,32 +452,15 @@ class NotionClient:
             return None
             
         # Default properties for a task
-        properties = {
-            "Name": {
-                "title": [
-                    {
-                        "text": {
-                            "content": task_name
-                        }
-                    }
-                ]
-            }
-        }
+        properties = {"Name": title_property(task_name)}
         
         # Add project name as a tag if provided
         if project_name:
-            properties["Tags"] = {
-                "multi_select": [
-                    {
-                        "name": project_name
-                    }
-                ]
-            }
+            properties["Tags"] = {"multi_select": [{"name": project_name}]}
             
         try:
-            response = requests.post(
-                f"{self.base_url}/pages",
-                headers=self.headers,
+            response = self._request(
+                "POST", "/pages", retry=False,
                 json={
                     "parent": {"database_id": database_id},
                     "properties": properties
@@ -152,188 +478,89 @@ class NotionClient:
                 self.logger.error(f"Exception creating task in Notion: {str(e)}")
             return None
     
-    def log_simple_session(self, database_id, project, task, start_time, end_time, duration_seconds):
-        """Simplified session logger with explicit focus on correct property types"""
-        if not self.token or not database_id:
-            return None
-            
+    def _build_log_properties(self, project, task, start_time, end_time, duration_seconds):
+        """Build the Notion properties for a session log entry"""
+        # Parse each timestamp once; a trailing Z is treated as UTC
+        start_dt = datetime.fromisoformat(start_time[:-1] + "+00:00" if start_time.endswith("Z") else start_time)
+        end_dt = datetime.fromisoformat(end_time[:-1] + "+00:00" if end_time.endswith("Z") else end_time)
+        
         # Format duration for display
-        duration_minutes = float(duration_seconds) / 60.0  # Explicitly convert to float
-        
-        # Format the date and time strings for Notion
-        date_str = start_time.split('T')[0]  # Extract YYYY-MM-DD
-        start_time_obj = datetime.fromisoformat(start_time.replace('Z', '+00:00') if 'Z' in start_time else start_time)
-        end_time_obj = datetime.fromisoformat(end_time.replace('Z', '+00:00') if 'Z' in end_time else end_time)
-        
-        start_time_str = start_time_obj.strftime("%H:%M")
-        end_time_str = end_time_obj.strftime("%H:%M")
-        
-        # Create a simple properties object with correct property types
-        properties = {
-            "Name": {
-                "title": [
-                    {
-                        "text": {
-                            "content": f"Session: {task}"
-                        }
-                    }
-                ]
-            },
-            "Date": {
-                "date": {
-                    "start": date_str
-                }
-            },
-            "Project": {  
-                "select": {  # Changed from rich_text to select
-                    "name": project
-                }
-            },
-            "Task": {
-                "rich_text": [
-                    {
-                        "text": {
-                            "content": task
-                        }
-                    }
-                ]
-            },
-            "Start Time": {
-                "rich_text": [
-                    {
-                        "text": {
-                            "content": start_time_str
-                        }
-                    }
-                ]
-            },
-            "End Time": {
-                "rich_text": [
-                    {
-                        "text": {
-                            "content": end_time_str
-                        }
-                    }
-                ]
-            },
-            "Duration": {  
-                "rich_text": [  # Changed from number to rich_text
-                    {
-                        "text": {
-                            "content": f"{int(duration_minutes)} min" 
-                        }
-                    }
-                ]
-            }
+        duration_minutes = float(duration_seconds) / 60.0
+        
+        return {
+            "Name": title_property(f"Session: {task}"),
+            "Date": {"date": {"start": start_dt.date().isoformat()}},
+            "Project": {"select": {"name": project}},
+            "Task": rich_text_property(task),
+            "Start Time": rich_text_property(start_dt.strftime("%H:%M")),
+            "End Time": rich_text_property(end_dt.strftime("%H:%M")),
+            "Duration": rich_text_property(f"{int(duration_minutes)} min")
         }
         
-        try:
-            # Log the request for debugging
-            if self.logger:
-                self.logger.info(f"Logging session with duration: {duration_minutes} minutes ({type(duration_minutes).__name__})")
-                
-            response = requests.post(
-                f"{self.base_url}/pages",
-                headers=self.headers,
-                json={
-                    "parent": {"database_id": database_id},
-                    "properties": properties
-                }
-            )
-            
-            if response.status_code == 200:
-                if self.logger:
-                    self.logger.info(f"Successfully logged session to Notion: {project} - {task}")
-                return response.json()
-            else:
-                if self.logger:
-                    self.logger.error(f"Failed to log session to Notion: {response.text}")
-                return None
-        except Exception as e:
+    def find_logged_session(self, database_id, key):
+        """Return the page previously logged with an idempotency key, or None
+        
+        Databases that reject the query because they have no idem property
+        are remembered and logged to without the key from then on. Any other
+        failure raises requests.HTTPError.
+        """
+        response = self._request(
+            "POST", f"/databases/{database_id}/query",
+            json={
+                "filter": {"property": IDEMPOTENCY_PROPERTY, "rich_text": {"equals": key}},
+                "page_size": 1
+            }
+        )
+        
+        if response.status_code == 400 and self._is_missing_property_error(response):
+            self._no_idempotency.add(database_id)
             if self.logger:
-                self.logger.error(f"Exception logging session to Notion: {str(e)}")
+                self.logger.warning(f"Log database has no '{IDEMPOTENCY_PROPERTY}' text property; "
+                                    f"sessions will be logged without duplicate checks")
             return None
             
-    def log_session(self, database_id, project, task, start_time, end_time, duration_seconds):
-        """Log a completed Pomodoro session to a Notion database"""
+        response.raise_for_status()
+        results = response.json().get("results", [])
+        return results[0] if results else None
+        
+    @staticmethod
+    def _is_missing_property_error(response):
+        """Return True if a 400 response says the filtered property doesn't exist"""
+        try:
+            error = response.json()
+        except ValueError:
+            return False
+        return (error.get("code") == "validation_error"
+                and "Could not find property" in error.get("message", ""))
+        
+    def log_simple_session(self, database_id, project, task, start_time, end_time, duration_seconds, key=None):
+        """Kept for compatibility; same as log_session"""
+        return self.log_session(database_id, project, task, start_time, end_time, duration_seconds, key)
+        
+    def log_session(self, database_id, project, task, start_time, end_time, duration_seconds, key=None):
+        """Log a completed Pomodoro session to a Notion database
+        
+        If key is given and the database has an idem property, a session
+        already logged with the same key is returned instead of creating a
+        duplicate page.
+        """
         if not self.token or not database_id:
             return None
             
-        # Format duration for display
-        duration_minutes = duration_seconds / 60
-        duration_formatted = f"{int(duration_minutes)} min"
-        
-        # Format the date and time strings for Notion
-        date_str = start_time.split('T')[0]  # Extract YYYY-MM-DD
-        start_time_obj = datetime.fromisoformat(start_time.replace('Z', '+00:00') if 'Z' in start_time else start_time)
-        end_time_obj = datetime.fromisoformat(end_time.replace('Z', '+00:00') if 'Z' in end_time else end_time)
-        
-        start_time_str = start_time_obj.strftime("%H:%M")
-        end_time_str = end_time_obj.strftime("%H:%M")
-        
-        # Create properties for the log entry
-        properties = {
-            "Name": {
-                "title": [
-                    {
-                        "text": {
-                            "content": f"Session: {task}"
-                        }
-                    }
-                ]
-            },
-            "Date": {
-                "date": {
-                    "start": date_str
-                }
-            },
-            "Project": {
-                "select": {  # Updated to use select instead of rich_text
-                    "name": project
-                }
-            },
-            "Task": {
-                "rich_text": [
-                    {
-                        "text": {
-                            "content": task
-                        }
-                    }
-                ]
-            },
-            "Start Time": {
-                "rich_text": [
-                    {
-                        "text": {
-                            "content": start_time_str
-                        }
-                    }
-                ]
-            },
-            "End Time": {
-                "rich_text": [
-                    {
-                        "text": {
-                            "content": end_time_str
-                        }
-                    }
-                ]
-            },
-            "Duration": {
-                "rich_text": [  # Updated to use rich_text instead of number
-                    {
-                        "text": {
-                            "content": duration_formatted
-                        }
-                    }
-                ]
-            }
-        }
+        properties = self._build_log_properties(project, task, start_time, end_time, duration_seconds)
         
         try:
-            response = requests.post(
-                f"{self.base_url}/pages",
-                headers=self.headers,
+            if key and database_id not in self._no_idempotency:
+                existing = self.find_logged_session(database_id, key)
+                if existing is not None:
+                    if self.logger:
+                        self.logger.info(f"Session already in Notion, not logging again: {project} - {task}")
+                    return existing
+                if database_id not in self._no_idempotency:
+                    properties[IDEMPOTENCY_PROPERTY] = rich_text_property(key)
+                    
+            response = self._request(
+                "POST", "/pages", retry=False,
                 json={
                     "parent": {"database_id": database_id},
                     "properties": properties
@@ -356,16 +583,44 @@ class NotionClient:
 class NotionIntegration:
     """Class to handle Notion integration with the Pomodoro app"""
     
-    def __init__(self, parent, pomodoro_app):
+    def __init__(self, parent, pomodoro_app, loop=None, rate_limiter=None):
         self.parent = parent
         self.pomodoro_app = pomodoro_app
+        # asyncio loop for Notion calls; start our own if none was given so
+        # that Notion work never runs on the Tk thread
+        self._owns_loop = loop is None
+        if self._owns_loop:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, daemon=True).start()
+        self.loop = loop
         self.config_file = "notion_config.json"
-        self.client = NotionClient()
+        self.client = NotionClient(rate_limiter=rate_limiter)
         self.client.logger = pomodoro_app.logger  # Pass logger to client
         self.selected_database = None
         self.log_database = None  # Database for session logs
+        self.last_task_sync = {}  # Database id -> latest last_edited_time imported
         self.databases = []
+        self._db_index = {}  # Database id -> {"title": ..., "index": ...}
+        # Start-date ordinals parallel to the task_sessions list they were built from
+        self._session_dates = array.array("l")
+        self._indexed_sessions = None
+        self._dates_sorted = True  # False once any session starts before the one before it
+        # start_time of every session already logged to Notion
+        self._logged_keys = {s["start_time"] for s in pomodoro_app.task_sessions
+                             if s.get("notion_logged", False)}
+        self._progress_queue = queue.Queue()  # (done, total) updates from workers
+        self._progress_text = None  # Label prefix while a bulk job runs
+        self._progress_after_id = None
+        self._cancel_event = threading.Event()  # Set to stop the running bulk job
         self.auto_log_sessions = tk.BooleanVar(value=False)  # Control auto-logging
+        self._pending = []  # Sessions waiting to be logged to Notion
+        self._pending_lock = threading.Lock()
+        self._flush_futures = set()  # Flushes started by flush_pending still running
+        self._in_flight = set()  # start_time of sessions a flush is sending now
+        self._log_attempts = {}  # start_time -> failed queued sends so far
+        self._save_after_id = None  # Pending debounced save_data call
+        self.dispatcher = TkDispatcher(parent, pomodoro_app.logger)
+        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
         
         # Load existing configuration
         self.load_config()
@@ -383,22 +638,29 @@ class NotionIntegration:
         # Create the UI
         self.create_widgets()
         
+        # Check the connection and fetch databases together at startup
+        self.start_initial_sync()
+        
+        # Periodically flush any queued session logs
+        self.parent.after(FLUSH_INTERVAL_MS, self._periodic_flush)
+        
     def load_config(self):
         """Load Notion configuration from file"""
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, "r") as file:
-                    config = json.load(file)
+                with open(self.config_file, "rb") as file:
+                    config = loads_json(file.read())
                     token = config.get("token")
                     if token:
                         self.client.set_token(token)
                     self.selected_database = config.get("selected_database")
                     self.log_database = config.get("log_database")
+                    self.last_task_sync = config.get("last_task_sync") or {}
                     
                     # Load auto-log preference
                     if "auto_log" in config:
                         self.auto_log_sessions.set(config.get("auto_log"))
-            except:
+            except (OSError, ValueError, AttributeError):
                 # If file exists but can't be read, initialize with empty config
                 self.save_config()
         else:
@@ -411,11 +673,16 @@ class NotionIntegration:
             "token": self.client.token,
             "selected_database": self.selected_database,
             "log_database": self.log_database,
-            "auto_log": self.auto_log_sessions.get()
+            "auto_log": self.auto_log_sessions.get(),
+            "last_task_sync": self.last_task_sync
         }
         
-        with open(self.config_file, "w") as file:
-            json.dump(config, file)
+        # Write to a temporary file and swap it in so a crash can't leave
+        # a half-written config behind
+        temp_file = self.config_file + ".tmp"
+        with open(temp_file, "wb") as file:
+            file.write(dumps_json(config))
+        os.replace(temp_file, self.config_file)
             
     def create_widgets(self):
         """Create the UI elements for Notion integration"""
@@ -476,7 +743,8 @@ class NotionIntegration:
         
         log_db_desc = ttk.Label(log_db_frame, 
                                text="Select a database to store completed Pomodoro session logs.\n"
-                                    "This database should have Date, Project, Task, Duration fields.")
+                                    "This database should have Date, Project, Task, Duration fields.\n"
+                                    "Add a text property named 'idem' to prevent duplicate session logs.")
         log_db_desc.pack(fill=tk.X, pady=5)
         
         # Database list for logs
@@ -509,12 +777,13 @@ class NotionIntegration:
         ).pack(anchor=tk.W, padx=5)
         
         # Manual log button
-        ttk.Button(
+        self.log_sessions_button = ttk.Button(
             log_options_frame, 
             text="Log Recent Sessions to Notion", 
             command=self.log_recent_sessions,
             width=25
-        ).pack(anchor=tk.W, padx=5, pady=5)
+        )
+        self.log_sessions_button.pack(anchor=tk.W, padx=5, pady=5)
         
         # Task synchronization section
         sync_frame = ttk.LabelFrame(main_frame, text="TASK SYNCHRONIZATION", padding="15")
@@ -524,7 +793,8 @@ class NotionIntegration:
         sync_buttons.pack(fill=tk.X, pady=10)
         
         ttk.Button(sync_buttons, text="Import Tasks from Notion", command=self.import_tasks, width=25).pack(side=tk.LEFT, padx=5)
-        ttk.Button(sync_buttons, text="Export Tasks to Notion", command=self.export_tasks, width=25).pack(side=tk.LEFT, padx=5)
+        self.export_button = ttk.Button(sync_buttons, text="Export Tasks to Notion", command=self.export_tasks, width=25)
+        self.export_button.pack(side=tk.LEFT, padx=5)
         
         # Auto-sync options
         auto_sync_frame = ttk.Frame(sync_frame)
@@ -533,11 +803,24 @@ class NotionIntegration:
         self.auto_sync_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(auto_sync_frame, text="Auto-sync new tasks to Notion", variable=self.auto_sync_var).pack(anchor=tk.W, padx=5)
         
+        # Progress of bulk export/log jobs
+        progress_frame = ttk.Frame(main_frame)
+        progress_frame.pack(fill=tk.X, pady=5)
+        
+        self.progress_label = ttk.Label(progress_frame, text="")
+        self.progress_label.pack(fill=tk.X)
+        
+        self.cancel_button = ttk.Button(progress_frame, text="Cancel", command=self.cancel_progress,
+                                        state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        
+        self.progress_bar = ttk.Progressbar(progress_frame, mode="determinate")
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        
         # Close button at bottom
         ttk.Button(main_frame, text="Close", command=self.window.withdraw).pack(pady=10)
         
         # Update UI based on current state
-        self.update_connection_status()
         self.populate_database_list()
         
     def show(self):
@@ -545,6 +828,327 @@ class NotionIntegration:
         self.window.deiconify()
         self.window.lift()
         
+    def start_initial_sync(self):
+        """Test the connection and load databases concurrently at startup"""
+        if not self.client.token:
+            return
+            
+        self.connection_status.config(text="Connecting...", foreground="gray")
+        self._schedule(self._initial_fetch(), self._on_initial_fetch)
+        
+    async def _initial_fetch(self):
+        """Run the startup Notion requests in parallel"""
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            loop.run_in_executor(self.executor, self.client.test_connection),
+            loop.run_in_executor(self.executor, self.client.get_databases)
+        )
+        
+    def _on_initial_fetch(self, results):
+        """Apply the startup connection status and database list"""
+        is_connected, databases = results
+        self.update_connection_status(is_connected)
+        self.set_databases(databases)
+        self.populate_database_list()
+        
+    def run_in_background(self, func, *args, callback=None, errback=None):
+        """Run a blocking Notion call on the worker pool
+        
+        The callback is invoked on the Tk thread with the result once the
+        call completes, or errback with the exception if it raised.
+        """
+        return self._deliver(self.executor.submit(func, *args), callback, errback)
+        
+    def _schedule(self, coro, callback=None, errback=None):
+        """Schedule a coroutine on the background loop and deliver its result to Tk"""
+        return self._deliver(asyncio.run_coroutine_threadsafe(coro, self.loop), callback, errback)
+        
+    def _deliver(self, future, callback=None, errback=None):
+        """Pass the result of a background future to callback on the Tk thread
+        
+        If the future raised, the exception is logged and passed to errback
+        instead, so callers can always restore the UI.
+        """
+        def on_done(fut):
+            if fut.cancelled():
+                return
+            error = fut.exception()
+            if error is not None:
+                if self.pomodoro_app.logger:
+                    self.pomodoro_app.logger.error(f"Background Notion call failed: {error}")
+                if errback:
+                    self.dispatcher.call_soon(errback, error)
+                return
+            if callback:
+                # Hand the result back to the Tk thread
+                self.dispatcher.call_soon(callback, fut.result())
+                
+        future.add_done_callback(on_done)
+        return future
+        
+    async def _gather_calls(self, func, items, progress=None, cancel=None):
+        """Call func for every item concurrently, with a bounded number in flight
+        
+        Once the cancel event is set, items that haven't started get None.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        total = len(items)
+        done = 0
+        
+        async def call(item):
+            nonlocal done
+            async with semaphore:
+                if cancel is not None and cancel.is_set():
+                    result = None
+                else:
+                    try:
+                        result = await loop.run_in_executor(self.executor, func, item)
+                    except Exception as e:
+                        # Count the item as failed rather than losing the whole batch
+                        if self.pomodoro_app.logger:
+                            self.pomodoro_app.logger.error(f"Notion call failed: {str(e)}")
+                        result = None
+            done += 1
+            if progress is not None:
+                progress.put((done, total))
+            return result
+            
+        return await asyncio.gather(*(call(item) for item in items))
+        
+    def run_concurrently(self, func, items, callback, progress=None, cancel=None, errback=None):
+        """Call func for every item off the Tk thread
+        
+        The callback receives the list of results, in the same order as items,
+        on the Tk thread. Items whose call raised get None.
+        """
+        return self._schedule(self._gather_calls(func, items, progress, cancel), callback, errback)
+        
+    def _on_background_error(self, error):
+        """Restore the UI and report a background Notion call that raised"""
+        self.window.config(cursor="")
+        messagebox.showerror("Notion Error", f"The Notion request failed:\n{error}")
+        
+    def _on_bulk_job_error(self, error):
+        """End the progress display of a bulk job that raised"""
+        self._stop_progress()
+        messagebox.showerror("Notion Error", f"The Notion job stopped unexpectedly:\n{error}")
+        
+    def _start_progress(self, text):
+        """Show progress of a bulk job, updated from the progress queue
+        
+        Only one bulk job runs at a time; returns False if one already is.
+        """
+        if self._progress_text is not None:
+            return False
+            
+        self._progress_text = text
+        self.export_button.config(state=tk.DISABLED)
+        self.log_sessions_button.config(state=tk.DISABLED)
+        self._cancel_event.clear()
+        self.progress_label.config(text=f"{text}...")
+        self.progress_bar.config(value=0, maximum=1)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.window.config(cursor="wait")
+        self._progress_after_id = self.window.after(100, self._drain_progress)
+        return True
+        
+    def cancel_progress(self):
+        """Ask the running bulk job to skip the items it hasn't started"""
+        self._cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.progress_label.config(text=f"{self._progress_text}: cancelling...")
+        
+    def _drain_progress(self):
+        """Apply the latest (done, total) update posted by the worker"""
+        latest = None
+        while True:
+            try:
+                latest = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+                
+        if latest and not self._cancel_event.is_set():
+            done, total = latest
+            self.progress_label.config(text=f"{self._progress_text}: {done} of {total}")
+            self.progress_bar.config(value=done, maximum=total)
+        self._progress_after_id = self.window.after(100, self._drain_progress)
+        
+    def _stop_progress(self):
+        """Clear the progress display once a bulk job finishes"""
+        if self._progress_after_id is not None:
+            self.window.after_cancel(self._progress_after_id)
+            self._progress_after_id = None
+        self._progress_text = None
+        self.progress_label.config(text="")
+        self.progress_bar.config(value=0)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.export_button.config(state=tk.NORMAL)
+        self.log_sessions_button.config(state=tk.NORMAL)
+        self.window.config(cursor="")
+        
+        # Drop any updates that arrived after the last drain
+        while True:
+            try:
+                self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+        
+    def queue_session_log(self, session):
+        """Queue a completed session to be sent with the next flush"""
+        with self._pending_lock:
+            if not any(pending is session for pending in self._pending):
+                self._pending.append(session)
+                
+    def _take_pending(self):
+        """Remove and return the next batch of queued sessions
+        
+        Sessions that were logged another way since being queued are dropped.
+        """
+        with self._pending_lock:
+            batch = [session for session in self._pending[:NOTION_BATCH_SIZE]
+                     if session["start_time"] not in self._logged_keys]
+            del self._pending[:NOTION_BATCH_SIZE]
+            self._in_flight.update(session["start_time"] for session in batch)
+        return batch
+        
+    def _discard_pending(self, sessions):
+        """Remove sessions from the queue, e.g. because they are being logged manually"""
+        keys = {session["start_time"] for session in sessions}
+        with self._pending_lock:
+            self._pending[:] = [pending for pending in self._pending if pending["start_time"] not in keys]
+            
+    def _requeue(self, sessions):
+        """Put sessions that failed to log back at the front of the queue
+        
+        A session that has failed MAX_LOG_ATTEMPTS times is dropped; it stays
+        unlogged and can still be sent with Log Recent Sessions.
+        """
+        retry = []
+        for session in sessions:
+            key = session["start_time"]
+            attempts = self._log_attempts.get(key, 0) + 1
+            if attempts < MAX_LOG_ATTEMPTS:
+                self._log_attempts[key] = attempts
+                retry.append(session)
+            else:
+                self._log_attempts.pop(key, None)
+                if self.pomodoro_app.logger:
+                    self.pomodoro_app.logger.warning(f"Giving up on logging session from {key} to Notion "
+                                                     f"after {attempts} attempts")
+                                                     
+        with self._pending_lock:
+            queued = [pending for pending in self._pending
+                      if not any(pending is session for session in retry)]
+            self._pending[:] = retry + queued
+            
+    async def _flush(self):
+        """Send all queued sessions to Notion in batches of at most 100
+        
+        Sessions that fail are queued again for the next periodic flush.
+        """
+        logged = []
+        failed = []
+        batch = self._take_pending()
+        try:
+            while batch:
+                results = await self._gather_calls(self.log_session_to_notion, batch)
+                for session, ok in zip(batch, results):
+                    (logged if ok else failed).append(session)
+                batch = self._take_pending()
+        except BaseException:
+            failed.extend(batch)
+            # These results never reach _on_sessions_logged
+            for session in logged:
+                self._in_flight.discard(session["start_time"])
+            raise
+        finally:
+            for session in failed:
+                self._in_flight.discard(session["start_time"])
+            if failed:
+                self._requeue(failed)
+        for session in logged:
+            self._log_attempts.pop(session["start_time"], None)
+        return logged
+        
+    def flush_pending(self):
+        """Flush queued session logs without blocking the UI"""
+        # Keep the flush until its result reaches the Tk thread, so shutdown
+        # can wait for it and mark its sessions if that never happens
+        def on_flushed(sessions):
+            self._flush_futures.discard(future)
+            self._on_sessions_logged(sessions)
+            
+        def on_failed(error):
+            self._flush_futures.discard(future)
+            
+        future = self._schedule(self._flush(), on_flushed, on_failed)
+        self._flush_futures.add(future)
+        return future
+        
+    def _periodic_flush(self):
+        """Retry queued session logs and reschedule the timer"""
+        if self._pending:
+            self.flush_pending()
+        self.parent.after(FLUSH_INTERVAL_MS, self._periodic_flush)
+        
+    def _on_sessions_logged(self, sessions):
+        """Mark flushed sessions as logged and save them once"""
+        if not sessions:
+            return
+            
+        for session in sessions:
+            # Mark as logged to prevent duplicates
+            self.mark_logged(session)
+            self._in_flight.discard(session["start_time"])
+            print(f"Session logged to Notion: {session['project']} - {session['task']}")
+            
+        self._schedule_save()
+        
+    def _schedule_save(self):
+        """Save session data once after a burst of auto-logged sessions"""
+        if self._save_after_id is not None:
+            self.parent.after_cancel(self._save_after_id)
+        self._save_after_id = self.parent.after(SAVE_DELAY_MS, self._flush_save)
+        
+    def _flush_save(self):
+        """Run a pending debounced save immediately"""
+        if self._save_after_id is not None:
+            self.parent.after_cancel(self._save_after_id)
+            self._save_after_id = None
+        self.pomodoro_app.save_data()
+        
+    def shutdown(self, timeout=10):
+        """Flush queued session logs before the application exits"""
+        deadline = time.monotonic() + timeout
+        
+        def wait_for(future):
+            # Tk callbacks no longer run once the root is destroyed, so mark
+            # the logged sessions here
+            try:
+                self._on_sessions_logged(future.result(max(0, deadline - time.monotonic())))
+            except Exception as e:
+                if self.pomodoro_app.logger:
+                    self.pomodoro_app.logger.error(f"Failed to flush session logs on exit: {str(e)}")
+                    
+        # Flushes already in flight have taken their sessions off the queue
+        for future in list(self._flush_futures):
+            wait_for(future)
+            
+        if self._pending:
+            wait_for(asyncio.run_coroutine_threadsafe(self._flush(), self.loop))
+            
+        # Tk timers won't fire after exit, so write any debounced save now
+        if self._save_after_id is not None:
+            self._flush_save()
+            
+        self.dispatcher.close()
+        self.executor.shutdown(wait=False)
+        self.client.close()
+        
+        if self._owns_loop:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        
     def set_token(self):
         """Prompt for and set the Notion API token"""
         token = simpledialog.askstring("Notion API Token", 
@@ -563,20 +1167,35 @@ class NotionIntegration:
             messagebox.showwarning("No Token", "Please set a Notion API token first.")
             return
             
-        if self.client.test_connection():
-            messagebox.showinfo("Connection Successful", "Successfully connected to Notion API!")
-            self.update_connection_status(True)
-        else:
-            messagebox.showerror("Connection Failed", "Could not connect to Notion API. Please check your token.")
-            self.update_connection_status(False)
+        def on_tested(is_connected):
+            if is_connected:
+                messagebox.showinfo("Connection Successful", "Successfully connected to Notion API!")
+                self.update_connection_status(True)
+            else:
+                messagebox.showerror("Connection Failed", "Could not connect to Notion API. Please check your token.")
+                self.update_connection_status(False)
+                
+        # Always probe on an explicit test, but off the Tk thread
+        self.connection_status.config(text="Testing connection...", foreground="gray")
+        self.run_in_background(self.client.test_connection, True, callback=on_tested)
             
     def update_connection_status(self, force_status=None):
-        """Update the connection status display"""
+        """Update the connection status display
+        
+        Without a forced status this uses the client's cached check, and
+        probes Notion in the background only if the cache is stale.
+        """
         if force_status is not None:
             is_connected = force_status
+        elif not self.client.token:
+            is_connected = False
         else:
-            is_connected = self.client.test_connection() if self.client.token else False
-            
+            is_connected = self.client.cached_connection_status()
+            if is_connected is None:
+                self.connection_status.config(text="Connecting...", foreground="gray")
+                self.run_in_background(self.client.test_connection, callback=self.update_connection_status)
+                return
+                
         if is_connected:
             self.connection_status.config(text="Connected to Notion", foreground="green")
         else:
@@ -588,27 +1207,38 @@ class NotionIntegration:
             messagebox.showwarning("No Token", "Please set a Notion API token first.")
             return
             
-        # Show a wait cursor
+        # Show a wait cursor; only flush pending redraws, not the whole event queue
         self.window.config(cursor="wait")
-        self.window.update()
+        self.window.update_idletasks()
         
-        try:
-            # Get databases from Notion
-            self.databases = self.client.get_databases()
-            
-            # Populate the listboxes
-            self.populate_database_list()
-            
-            # Provide feedback about the result
-            if not self.databases:
-                messagebox.showinfo("No Databases Found", 
-                                  "No databases were found. Make sure you have:\n\n"
-                                  "1. Created at least one database in Notion\n"
-                                  "2. Shared the database with your integration\n"
-                                  "3. Given the integration the correct permissions")
-        finally:
-            # Restore normal cursor
-            self.window.config(cursor="")
+        # Get databases from Notion without blocking the UI
+        self.run_in_background(self.client.get_databases, True, callback=self._on_databases_refreshed,
+                               errback=self._on_background_error)
+        
+    def _on_databases_refreshed(self, databases):
+        """Show a freshly fetched database list"""
+        # Restore normal cursor
+        self.window.config(cursor="")
+        
+        # Populate the listboxes
+        self.set_databases(databases)
+        self.populate_database_list()
+        
+        # Provide feedback about the result
+        if not self.databases:
+            messagebox.showinfo("No Databases Found", 
+                              "No databases were found. Make sure you have:\n\n"
+                              "1. Created at least one database in Notion\n"
+                              "2. Shared the database with your integration\n"
+                              "3. Given the integration the correct permissions")
+        
+    def set_databases(self, databases):
+        """Store the database list and index titles and positions by id"""
+        self.databases = databases
+        self._db_index = {
+            db.get("id"): {"title": self.get_database_title(db), "index": index}
+            for index, db in enumerate(databases)
+        }
         
     def populate_database_list(self):
         """Populate the listbox with available databases"""
@@ -616,36 +1246,34 @@ class NotionIntegration:
         self.log_db_listbox.delete(0, tk.END)
         
         for db in self.databases:
-            title = self.get_database_title(db)
+            db_id = db.get("id")
+            entry = self._db_index[db_id]
+            title = entry["title"]
+            index = entry["index"]
             
             # Add to both listboxes
             self.db_listbox.insert(tk.END, title)
             self.log_db_listbox.insert(tk.END, title)
             
             # If this is the previously selected task database, select it
-            if db.get("id") == self.selected_database:
-                index = self.databases.index(db)
+            if db_id == self.selected_database:
                 self.db_listbox.selection_set(index)
                 self.selected_db_label.config(text=f"Selected for tasks: {title}")
                 
             # If this is the previously selected log database, select it
-            if db.get("id") == self.log_database:
-                index = self.databases.index(db)
+            if db_id == self.log_database:
                 self.log_db_listbox.selection_set(index)
                 self.log_db_label.config(text=f"Selected for logs: {title}")
                 
     def get_database_title(self, db):
         """Extract the title from a database object"""
-        try:
-            title = db.get("title", [{}])[0].get("plain_text", "Untitled Database")
-            return title
-        except (IndexError, KeyError, AttributeError):
-            try:
-                # Try alternative way of getting title
-                title = db.get("properties", {}).get("title", {}).get("title", {}).get("name", "Untitled Database")
-                return title
-            except (IndexError, KeyError, AttributeError):
-                return "Untitled Database"
+        title = db.get("title")
+        if title:
+            return title[0].get("plain_text", "Untitled Database")
+            
+        # Try alternative way of getting title
+        title_prop = (db.get("properties") or {}).get("title") or {}
+        return (title_prop.get("title") or {}).get("name", "Untitled Database")
             
     def on_database_select(self, event):
         """Handle task database selection from the listbox"""
@@ -655,9 +1283,8 @@ class NotionIntegration:
             
         index = selection[0]
         if index < len(self.databases):
-            selected_db = self.databases[index]
-            self.selected_database = selected_db.get("id")
-            title = self.get_database_title(selected_db)
+            self.selected_database = self.databases[index].get("id")
+            title = self._db_index[self.selected_database]["title"]
             self.selected_db_label.config(text=f"Selected for tasks: {title}")
             self.save_config()
             
@@ -669,9 +1296,8 @@ class NotionIntegration:
             
         index = selection[0]
         if index < len(self.databases):
-            selected_db = self.databases[index]
-            self.log_database = selected_db.get("id")
-            title = self.get_database_title(selected_db)
+            self.log_database = self.databases[index].get("id")
+            title = self._db_index[self.log_database]["title"]
             self.log_db_label.config(text=f"Selected for logs: {title}")
             self.save_config()
             
@@ -685,80 +1311,142 @@ class NotionIntegration:
             messagebox.showwarning("No Database", "Please select a Notion database first.")
             return
             
-        # Get tasks from the selected database
-        notion_tasks = self.client.get_database_tasks(self.selected_database)
+        # Only fetch tasks edited since the last import from this database
+        database_id = self.selected_database
+        since = self.last_task_sync.get(database_id)
+        
+        # Fetch tasks without blocking the UI
+        self.window.config(cursor="wait")
+        self.run_in_background(self.client.get_database_tasks, database_id, since,
+                               callback=lambda tasks: self._on_tasks_fetched(database_id, since, tasks),
+                               errback=self._on_background_error)
+        
+    def _on_tasks_fetched(self, database_id, since, notion_tasks):
+        """Merge tasks fetched from Notion into the app"""
+        self.window.config(cursor="")
+        
         if not notion_tasks:
-            messagebox.showinfo("No Tasks", "No tasks found in the selected database.")
+            if since:
+                messagebox.showinfo("No Tasks", "No tasks have changed in the selected database since the last import.")
+            else:
+                messagebox.showinfo("No Tasks", "No tasks found in the selected database.")
             return
             
-        # Count how many new tasks were imported
-        imported_count = 0
-        
-        # Process each task
+        # Extract every task before touching app state, so a malformed task
+        # (re-raised in debug mode) can't leave a half-applied import
+        parsed = []
+        latest_edit = ""
         for task in notion_tasks:
-            # Extract task properties
             try:
                 task_name = self.extract_task_name(task)
                 project_name = self.extract_project_name(task)
-                
-                if task_name and project_name:
-                    # Format as "Project: Task" to match app's format
-                    task_key = f"{project_name}: {task_name}"
-                    
-                    # Add to projects if needed
-                    if project_name not in self.pomodoro_app.projects:
-                        self.pomodoro_app.projects.append(project_name)
-                        
-                    # Add to tasks if not already present
-                    if task_key not in self.pomodoro_app.tasks:
-                        self.pomodoro_app.tasks.append(task_key)
-                        imported_count += 1
-            except:
+                latest_edit = max(latest_edit, task.get("last_edited_time") or "")
+            except (AttributeError, KeyError, IndexError, TypeError):
+                if DEBUG:
+                    raise
                 # Skip tasks that can't be processed
+                if self.pomodoro_app.logger:
+                    self.pomodoro_app.logger.warning("Skipping Notion task with unexpected properties")
                 continue
                 
+            if task_name and project_name:
+                parsed.append((project_name, task_name))
+                
+        # Count how many new tasks were imported
+        imported_count = 0
+        
+        # Sets for O(1) membership checks; the lists keep their order
+        known_projects = set(self.pomodoro_app.projects)
+        known_tasks = set(self.pomodoro_app.tasks)
+        
+        for project_name, task_name in parsed:
+            # Format as "Project: Task" to match app's format
+            task_key = f"{project_name}: {task_name}"
+            
+            # Add to projects if needed
+            if project_name not in known_projects:
+                known_projects.add(project_name)
+                self.pomodoro_app.projects.append(project_name)
+                
+            # Add to tasks if not already present
+            if task_key not in known_tasks:
+                known_tasks.add(task_key)
+                self.pomodoro_app.tasks.append(task_key)
+                imported_count += 1
+                
         # Update the UI
         if imported_count > 0:
             self.pomodoro_app.project_combo['values'] = self.pomodoro_app.projects
             self.pomodoro_app.task_combo['values'] = self.pomodoro_app.tasks
             self.pomodoro_app.save_data()
+            
+        # Only now that the merge is saved, remember the newest edit seen so
+        # the next import is incremental
+        if latest_edit:
+            self.last_task_sync[database_id] = latest_edit
+            self.save_config()
+            
+        if imported_count > 0:
             messagebox.showinfo("Import Complete", f"Successfully imported {imported_count} tasks from Notion.")
         else:
             messagebox.showinfo("No New Tasks", "No new tasks were imported from Notion.")
             
     def extract_task_name(self, task):
         """Extract the task name from a Notion task object"""
-        try:
-            # Try to get name from title property
-            name_prop = task.get("properties", {}).get("Name", {}) or task.get("properties", {}).get("name", {}) or task.get("properties", {}).get("Title", {})
-            
-            if "title" in name_prop:
-                title_content = name_prop.get("title", [])
-                if title_content and len(title_content) > 0:
-                    return title_content[0].get("plain_text", "")
-        except:
-            pass
-            
-        return None
+        return first_plain_text(task.get("properties") or {}, ("Name", "name", "Title"))
         
     def extract_project_name(self, task):
         """Extract the project name from a Notion task object"""
-        try:
-            # Try to get project from multi_select property (Tags)
-            tags_prop = task.get("properties", {}).get("Tags", {}) or task.get("properties", {}).get("Project", {})
+        properties = task.get("properties") or {}
+        
+        # Try to get project from multi_select property (Tags)
+        for key in ("Tags", "Project"):
+            tags = (properties.get(key) or {}).get("multi_select")
+            if tags:
+                return tags[0].get("name", "Default Project")
+                
+        # If no tags found, return default project
+        return "Default Project"
             
-            if "multi_select" in tags_prop:
-                tags = tags_prop.get("multi_select", [])
-                if tags and len(tags) > 0:
-                    return tags[0].get("name", "Default Project")
+    def _ask_choice(self, title, prompt, options):
+        """Ask the user to pick one of options; returns its index or None if cancelled"""
+        dialog = tk.Toplevel(self.window)
+        dialog.title(title)
+        dialog.transient(self.window)
+        dialog.resizable(False, False)
+        
+        frame = ttk.Frame(dialog, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(frame, text=prompt).pack(anchor=tk.W, pady=(0, 10))
+        
+        var = tk.IntVar(value=0)
+        for index, option in enumerate(options):
+            ttk.Radiobutton(frame, text=option, variable=var, value=index).pack(anchor=tk.W, pady=2)
             
-            # If no tags found, return default project
-            return "Default Project"
-        except:
-            return "Default Project"
+        result = []
+        
+        def on_ok(event=None):
+            result.append(var.get())
+            dialog.destroy()
             
+        buttons_frame = ttk.Frame(frame)
+        buttons_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(buttons_frame, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(buttons_frame, text="OK", command=on_ok).pack(side=tk.RIGHT, padx=5)
+        
+        dialog.bind("<Return>", on_ok)
+        dialog.bind("<Escape>", lambda event: dialog.destroy())
+        dialog.focus_set()
+        dialog.wait_window()
+        
+        return result[0] if result else None
+        
     def export_tasks(self):
         """Export tasks from app to Notion database"""
+        if self._progress_text is not None:
+            return  # An export or log job is already running
+            
         if not self.client.token:
             messagebox.showwarning("No Token", "Please connect to Notion first.")
             return
@@ -769,49 +1457,55 @@ class NotionIntegration:
             
         # Ask which tasks to export
         export_options = ["All Tasks", "Selected Project Tasks"]
-        choice = simpledialog.askstring("Export Tasks", 
-                                      "Export options:\n1. All Tasks\n2. Selected Project Tasks\n\nEnter choice (1 or 2):",
-                                      parent=self.window)
+        choice = self._ask_choice("Export Tasks", "Export options:", export_options)
         
-        if not choice or choice not in ["1", "2"]:
+        if choice is None:
             return
             
-        tasks_to_export = []
-        if choice == "1":  # All Tasks
-            tasks_to_export = self.pomodoro_app.tasks
-        else:  # Selected Project Tasks
+        selected_project = None
+        if choice == 1:  # Selected Project Tasks
             selected_project = self.pomodoro_app.project_combo.get()
             if not selected_project:
                 messagebox.showwarning("No Project Selected", "Please select a project first.")
                 return
                 
-            # Filter tasks by the selected project
-            tasks_to_export = [task for task in self.pomodoro_app.tasks if task.startswith(f"{selected_project}:")]
-            
-        if not tasks_to_export:
+        # Split task keys into (task name, project name) in one pass,
+        # keeping only the selected project's tasks if one was chosen
+        items = []
+        add_item = items.append
+        for task_key in self.pomodoro_app.tasks:
+            project_name, sep, task_name = task_key.partition(": ")
+            if sep and (selected_project is None or project_name == selected_project):
+                add_item((task_name, project_name))
+                
+        if not items:
             messagebox.showinfo("No Tasks", "No tasks to export.")
             return
             
-        # Export tasks to Notion
-        exported_count = 0
-        for task_key in tasks_to_export:
-            # Split into project and task name
-            parts = task_key.split(": ", 1)
-            if len(parts) == 2:
-                project_name, task_name = parts
+        def on_exported(results):
+            self._stop_progress()
+            exported_count = sum(1 for result in results if result)
+            
+            if self._cancel_event.is_set():
+                messagebox.showinfo("Export Cancelled", f"Export cancelled after exporting {exported_count} tasks to Notion.")
+            elif exported_count > 0:
+                messagebox.showinfo("Export Complete", f"Successfully exported {exported_count} tasks to Notion.")
+            else:
+                messagebox.showinfo("Export Failed", "Failed to export tasks to Notion.")
                 
-                # Create task in Notion
-                result = self.client.create_task(self.selected_database, task_name, project_name)
-                if result:
-                    exported_count += 1
-                    
-        if exported_count > 0:
-            messagebox.showinfo("Export Complete", f"Successfully exported {exported_count} tasks to Notion.")
-        else:
-            messagebox.showinfo("Export Failed", "Failed to export tasks to Notion.")
+        # Export tasks to Notion without blocking the UI
+        if not self._start_progress("Exporting tasks"):
+            return
+        database_id = self.selected_database
+        self.run_concurrently(lambda item: self.client.create_task(database_id, *item), items, on_exported,
+                              progress=self._progress_queue, cancel=self._cancel_event,
+                              errback=self._on_bulk_job_error)
             
     def add_task_to_notion(self, project, task):
-        """Add a single task to Notion (called when auto-sync is enabled)"""
+        """Add a single task to Notion if auto-sync is enabled
+        
+        Reads Tk variables, so call it on the Tk thread only.
+        """
         if not self.auto_sync_var.get() or not self.client.token or not self.selected_database:
             return False
             
@@ -833,20 +1527,63 @@ class NotionIntegration:
         if not all([project, task, start_time, end_time, duration_seconds]):
             return False
             
-        # Log to Notion using the simplified method with better error handling
-        result = self.client.log_simple_session(
+        # Log to Notion; the key lets the client skip sessions that reached
+        # Notion before a crash kept them from being marked as logged
+        result = self.client.log_session(
             self.log_database,
             project,
             task,
             start_time,
             end_time,
-            duration_seconds
+            duration_seconds,
+            key=session_log_key(start_time, project, task)
         )
         
         return result is not None
     
+    def is_logged(self, session):
+        """Return True if the session has already been logged to Notion"""
+        return session["start_time"] in self._logged_keys
+        
+    def mark_logged(self, session):
+        """Record that a session has been logged to Notion"""
+        session["notion_logged"] = True
+        self._logged_keys.add(session["start_time"])
+        
+    def session_date_index(self):
+        """Return start-date ordinals for task_sessions, parsing only new sessions
+        
+        Sessions are normally appended in time order, so the ordinals are
+        sorted; _dates_sorted records whether that actually holds, since the
+        data file can be edited by hand and clocks can change. The index is
+        rebuilt when the sessions list is replaced or shrinks.
+        """
+        sessions = self.pomodoro_app.task_sessions
+        dates = self._session_dates
+        if sessions is not self._indexed_sessions or len(sessions) < len(dates):
+            dates = self._session_dates = array.array("l")
+            self._indexed_sessions = sessions
+            self._dates_sorted = True
+            
+        # Bind to locals; this runs once per session on the first log
+        append = dates.append
+        from_iso = datetime.fromisoformat
+        previous = dates[-1] if dates else None
+        is_sorted = self._dates_sorted
+        for session in sessions[len(dates):]:
+            ordinal = from_iso(session["start_time"]).toordinal()
+            if previous is not None and ordinal < previous:
+                is_sorted = False
+            append(ordinal)
+            previous = ordinal
+        self._dates_sorted = is_sorted
+        return dates
+        
     def log_recent_sessions(self):
         """Manually log recent sessions to Notion with duplicate prevention"""
+        if self._progress_text is not None:
+            return  # An export or log job is already running
+            
         if not self.client.token:
             messagebox.showwarning("No Token", "Please connect to Notion first.")
             return
@@ -857,51 +1594,49 @@ class NotionIntegration:
             
         # Ask how many recent sessions to log
         date_options = ["Today's Sessions", "Yesterday's Sessions", "Last 7 Days", "All Sessions"]
-        choice = simpledialog.askstring("Log Sessions", 
-                                      "Which sessions would you like to log to Notion?\n\n"
-                                      "1. Today's Sessions\n"
-                                      "2. Yesterday's Sessions\n"
-                                      "3. Last 7 Days\n"
-                                      "4. All Sessions\n\n"
-                                      "Enter choice (1-4):",
-                                      parent=self.window)
-        
-        if not choice or choice not in ["1", "2", "3", "4"]:
+        choice = self._ask_choice("Log Sessions", "Which sessions would you like to log to Notion?",
+                                  date_options)
+        
+        if choice is None:
             return
             
         # Determine date range
-        today = datetime.now().date()
-        if choice == "1":  # Today
+        today = date.today()
+        end_date = today
+        if choice == 0:  # Today
             start_date = today
             date_desc = "today"
-        elif choice == "2":  # Yesterday
-            start_date = today - timedelta(days=1)
+        elif choice == 1:  # Yesterday
+            start_date = today - _ONE_DAY
             end_date = start_date
             date_desc = "yesterday"
-        elif choice == "3":  # Last 7 days
-            start_date = today - timedelta(days=6)
+        elif choice == 2:  # Last 7 days
+            start_date = today - _SIX_DAYS
             date_desc = "the last 7 days"
         else:  # All sessions
             start_date = None
             date_desc = "all time"
             
-        # Filter sessions
-        sessions_to_log = []
-        for session in self.pomodoro_app.task_sessions:
-            # Skip sessions that are already logged to Notion
-            if session.get("notion_logged", False):
-                continue
-                
-            if not start_date:  # All sessions
-                sessions_to_log.append(session)
+        # Slice out the date range by bisecting the sorted start dates, or
+        # scan every date if the sessions are out of order
+        candidates = self.pomodoro_app.task_sessions
+        logged_keys = self._logged_keys
+        if start_date is not None:
+            dates = self.session_date_index()
+            first, last = start_date.toordinal(), end_date.toordinal()
+            if self._dates_sorted:
+                lo = bisect_left(dates, first)
+                hi = bisect_right(dates, last, lo)
+                candidates = candidates[lo:hi]
             else:
-                session_date = datetime.fromisoformat(session["start_time"]).date()
-                if choice in ["1", "3"]:  # Today or Last 7 days
-                    if start_date <= session_date <= today:
-                        sessions_to_log.append(session)
-                elif choice == "2":  # Yesterday
-                    if session_date == start_date:
-                        sessions_to_log.append(session)
+                candidates = [session for session, ordinal in zip(candidates, dates)
+                              if first <= ordinal <= last]
+            
+        # Skip sessions that are already logged to Notion
+        # Also skip sessions a queued auto-log flush is sending right now
+        in_flight = self._in_flight
+        sessions_to_log = [s for s in candidates
+                           if s["start_time"] not in logged_keys and s["start_time"] not in in_flight]
                     
         if not sessions_to_log:
             messagebox.showinfo("No Sessions", f"No new sessions found for {date_desc} to log.")
@@ -913,81 +1648,56 @@ class NotionIntegration:
                                   f"Continue?"):
             return
             
-        # Log sessions
-        successful = 0
-        for session in sessions_to_log:
-            if self.log_session_to_notion(session):
-                # Mark session as logged to prevent duplicates
-                session["notion_logged"] = True
-                successful += 1
+        # Log sessions concurrently without blocking the UI
+        if not self._start_progress("Logging sessions"):
+            return
+            
+        # These are sent now, so the auto-log queue must not send them again
+        self._discard_pending(sessions_to_log)
         
-        # Save the updated session data
-        self.pomodoro_app.save_data()
-                
-        # Show results
-        if successful > 0:
-            messagebox.showinfo("Logging Complete", 
-                               f"Successfully logged {successful} of {len(sessions_to_log)} sessions to Notion.")
-        else:
-            messagebox.showwarning("Logging Failed", 
-                                 f"Failed to log sessions to Notion. Please check your database configuration.")
+        def on_logged(results):
+            self._stop_progress()
+            
+            successful = 0
+            mark_logged = self.mark_logged
+            for session, logged in zip(sessions_to_log, results):
+                if logged:
+                    # Mark session as logged to prevent duplicates
+                    mark_logged(session)
+                    successful += 1
+                    
+            # Save the updated session data
+            self.pomodoro_app.save_data()
+            
+            # Show results
+            if self._cancel_event.is_set():
+                messagebox.showinfo("Logging Cancelled", 
+                                   f"Logging cancelled after logging {successful} of {len(sessions_to_log)} sessions to Notion.")
+            elif successful > 0:
+                messagebox.showinfo("Logging Complete", 
+                                   f"Successfully logged {successful} of {len(sessions_to_log)} sessions to Notion.")
+            else:
+                messagebox.showwarning("Logging Failed", 
+                                     f"Failed to log sessions to Notion. Please check your database configuration.")
+                                     
+        self.run_concurrently(self.log_session_to_notion, sessions_to_log, on_logged,
+                              progress=self._progress_queue, cancel=self._cancel_event,
+                              errback=self._on_bulk_job_error)
 
 
 # Function to integrate Notion with the Pomodoro Timer class
-def add_notion_integration(pomodoro_timer):
+def add_notion_integration(pomodoro_timer, loop=None, rate_limiter=None):
     """Add Notion integration to the Pomodoro Timer application"""
     
     # Create the Notion integration
-    notion_integration = NotionIntegration(pomodoro_timer.root, pomodoro_timer)
+    notion_integration = NotionIntegration(pomodoro_timer.root, pomodoro_timer, loop=loop,
+                                           rate_limiter=rate_limiter)
     
-    # Find a suitable settings frame using a more flexible approach
-    settings_frame = None
-    
-    # First, try to find settings frames by looking through the widget hierarchy
-    try:
-        # Look for frames that might contain settings
-        for frame in pomodoro_timer.root.winfo_children():
-            if isinstance(frame, ttk.Frame) or isinstance(frame, tk.Frame):
-                for child in frame.winfo_children():
-                    if isinstance(child, ttk.LabelFrame):
-                        # Check if this is likely a settings frame
-                        child_str = str(child).lower()
-                        if "settings" in child_str or "control" in child_str or "option" in child_str:
-                            settings_frame = child
-                            break
-                if settings_frame:
-                    break
-                    
-        # If no settings frame found, try to find the last LabelFrame as fallback
-        if not settings_frame:
-            main_frame = None
-            for widget in pomodoro_timer.root.winfo_children():
-                if isinstance(widget, ttk.Frame) or isinstance(widget, tk.Frame):
-                    main_frame = widget
-                    break
-                    
-            if main_frame:
-                last_frame = None
-                for child in main_frame.winfo_children():
-                    if isinstance(child, ttk.LabelFrame):
-                        last_frame = child
-                        
-                if last_frame:
-                    settings_frame = last_frame
-    except Exception as e:
-        print(f"Error finding settings frame: {e}")
-    
-    # If still no settings frame found, create a new one
-    if not settings_frame:
-        try:
-            main_container = pomodoro_timer.root.winfo_children()[0]  # Assume first child is main container
-            settings_frame = ttk.LabelFrame(main_container, text="SETTINGS")
-            settings_frame.pack(fill=tk.X, padx=5, pady=10)
-        except Exception as e:
-            print(f"Error creating settings frame: {e}")
-            # Last resort - use the root as the parent
-            settings_frame = ttk.LabelFrame(pomodoro_timer.root, text="SETTINGS")
-            settings_frame.pack(fill=tk.X, padx=5, pady=10)
+    # PomodoroTimer exposes its settings frame; only build one if it doesn't
+    settings_frame = getattr(pomodoro_timer, "settings_frame", None)
+    if settings_frame is None:
+        settings_frame = ttk.LabelFrame(pomodoro_timer.root, text="SETTINGS")
+        settings_frame.pack(fill=tk.X, padx=5, pady=10)
     
     # Add Notion button to the settings frame
     notion_button = ttk.Button(settings_frame, text="🔄 Notion Sync", 
@@ -1003,12 +1713,23 @@ def add_notion_integration(pomodoro_timer):
         
         # If auto-sync is enabled, sync the new task to Notion
         project = pomodoro_timer.project_combo.get()
-        task = pomodoro_timer.task_combo.get().replace(f"{project}: ", "") if project in pomodoro_timer.task_combo.get() else pomodoro_timer.task_combo.get()
-        
-        if notion_integration.auto_sync_var.get() and project and task:
-            # Try to add to Notion
-            if notion_integration.add_task_to_notion(project, task):
-                print(f"Task '{task}' auto-synced to Notion")
+        task = pomodoro_timer.task_combo.get()
+        prefix = f"{project}: "
+        if task.startswith(prefix):
+            task = task[len(prefix):]
+        
+        # Read the Tk variable and settings here on the Tk thread; the worker
+        # only gets plain values
+        database_id = notion_integration.selected_database
+        if (notion_integration.auto_sync_var.get() and notion_integration.client.token
+                and database_id and project and task):
+            def on_synced(result):
+                if result is not None:
+                    print(f"Task '{task}' auto-synced to Notion")
+                    
+            # Try to add to Notion without blocking the UI
+            notion_integration.run_in_background(
+                notion_integration.client.create_task, database_id, task, project, callback=on_synced)
     
     # Replace the add_task method
     pomodoro_timer.add_task = new_add_task
@@ -1027,15 +1748,12 @@ def add_notion_integration(pomodoro_timer):
                 latest_session = pomodoro_timer.task_sessions[-1]
                 
                 # Skip if already logged to Notion
-                if latest_session.get("notion_logged", False):
+                if notion_integration.is_logged(latest_session):
                     return
                     
-                # Try to log to Notion
-                if notion_integration.log_session_to_notion(latest_session):
-                    # Mark as logged to prevent duplicates
-                    latest_session["notion_logged"] = True
-                    pomodoro_timer.save_data()
-                    print(f"Session logged to Notion: {latest_session['project']} - {latest_session['task']}")
+                # Queue the session and send it without blocking the UI
+                notion_integration.queue_session_log(latest_session)
+                notion_integration.flush_pending()
     
     # Replace the record_task_session method
     pomodoro_timer.record_task_session = new_record_task_session
@@ -11,6 +11,12 @@ import sys
 from tkinter import font as tkfont  # For custom fonts
 
 class PomodoroTimer:
+    """Pomodoro timer window with task tracking
+    
+    Extensions such as the Notion integration add their controls to
+    self.settings_frame, the SETTINGS LabelFrame built in create_widgets.
+    """
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Pomodoro Timer with Task Tracking")
@@ -286,6 +292,7 @@ class PomodoroTimer:
         # Settings frame for app settings
         settings_frame = ttk.LabelFrame(controls_frame, text="SETTINGS", padding="10")
         settings_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=5)
+        self.settings_frame = settings_frame  # Exposed for extensions
         
         # Sound toggle with better styling
         sound_check = ttk.Checkbutton(settings_frame, text="🔊 Enable Sounds", variable=self.enable_sounds)